@@ -1,7 +1,21 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import io
-from datetime import datetime
+import time
+import requests
+from datetime import datetime, timedelta
+
+try:
+    from streamlit_gsheets import GSheetsConnection
+except ImportError:  # optional (pip install st-gsheets-connection): only for private sheets
+    GSheetsConnection = None
+
+try:
+    from streamlit_autorefresh import st_autorefresh
+    _HAS_AUTOREFRESH = True
+except ImportError:  # optional: only needed on Streamlit < 1.37 (no st.fragment)
+    _HAS_AUTOREFRESH = False
 
 # ---------------------- Page config ----------------------
 st.set_page_config(
@@ -14,7 +28,8 @@ st.set_page_config(
 SHEET_ID = "1W6KceOOBmnGxblXell3gvTC4vZ7LwHaOYQPZESYGxXQ"
 # If your leaderboard is on the first sheet, this CSV export works as-is.
 # If it's on another tab, append &gid=<tab_gid> to the URL.
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv"
+SHEET_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}"
+CSV_URL = f"{SHEET_URL}/export?format=csv"
 
 REQUIRED_COLUMNS = [
     "Team_Name", "Game_1", "Game_2", "Game_3", "Game_4", "Column 6", "Total_points"
@@ -22,37 +37,71 @@ REQUIRED_COLUMNS = [
 
 GAME_COLUMNS = ["Game_1", "Game_2", "Game_3", "Game_4"]
 
+REFRESH_INTERVAL_MS = 120_000   # auto-refresh cadence (2 minutes)
+HEAD_TIMEOUT_S = 3              # revision check must stay much cheaper than a GET
+HEAD_BACKOFF_S = 30             # pause revision checks after a failed HEAD
+
+_COLUMN_CONFIG = {
+    "Team_Name": st.column_config.TextColumn("🏅 Team Name", help="Team participating in the fund raiser"),
+    "Game_1": st.column_config.NumberColumn("🎮 Game 1", help="Points from Game 1", format="%d"),
+    "Game_2": st.column_config.NumberColumn("🎯 Game 2", help="Points from Game 2", format="%d"),
+    "Game_3": st.column_config.NumberColumn("🎲 Game 3", help="Points from Game 3", format="%d"),
+    "Game_4": st.column_config.NumberColumn("🏃 Game 4", help="Points from Game 4", format="%d"),
+    "Column 6": st.column_config.NumberColumn("⭐ Bonus", help="Bonus points", format="%d"),
+    "Total_points": st.column_config.NumberColumn("🏆 Total Points", help="Sum of all points", format="%d"),
+    "Rank": st.column_config.NumberColumn("🥇 Rank", help="Current ranking position", format="%d"),
+}
+
+_REQUIRED_SET = frozenset(REQUIRED_COLUMNS)
+
+# Expected CSV schema. Nullable Arrow ints so blank cells (e.g. an empty
+# Total_points column) survive the cast and are filled in later.
+_READ_DTYPES = {
+    "Team_Name": "string[pyarrow]",
+    **{c: "int32[pyarrow]" for c in GAME_COLUMNS},
+    "Column 6": "int32[pyarrow]",
+    "Total_points": "int32[pyarrow]",
+}
+
+# Lower-cased header aliases -> required column name
+_COL_ALIASES = {
+    "team name": "Team_Name",
+    "team_name": "Team_Name",
+    "team": "Team_Name",
+    "game1": "Game_1",
+    "game 1": "Game_1",
+    "game2": "Game_2",
+    "game 2": "Game_2",
+    "game3": "Game_3",
+    "game 3": "Game_3",
+    "game4": "Game_4",
+    "game 4": "Game_4",
+    "column6": "Column 6",
+    "column_6": "Column 6",
+    "bonus": "Column 6",
+    "total": "Total_points",
+    "total points": "Total_points",
+    "total_points": "Total_points",
+}
+
+_MEDALS = ("🥇", "🥈", "🥉")
+
 # ---------------------- Helpers --------------------------
 def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Try to coerce similar column names to the required schema.
     e.g. 'Team Name' -> 'Team_Name', 'Column6' -> 'Column 6'
     """
-    mapping_candidates = {
-        "team name": "Team_Name",
-        "team_name": "Team_Name",
-        "team": "Team_Name",
-        "game1": "Game_1",
-        "game 1": "Game_1",
-        "game2": "Game_2",
-        "game 2": "Game_2",
-        "game3": "Game_3",
-        "game 3": "Game_3",
-        "game4": "Game_4",
-        "game 4": "Game_4",
-        "column6": "Column 6",
-        "column_6": "Column 6",
-        "bonus": "Column 6",
-        "total": "Total_points",
-        "total points": "Total_points",
-        "total_points": "Total_points",
-    }
-
     new_cols = {}
     for c in df.columns:
+        if c in _REQUIRED_SET:
+            continue
         key = str(c).strip().lower()
-        new_cols[c] = mapping_candidates.get(key, c)
-    df = df.rename(columns=new_cols)
+        mapped = _COL_ALIASES.get(key)
+        if mapped is not None and mapped != c:
+            new_cols[c] = mapped
+    if new_cols:
+        df = df.rename(columns=new_cols)
     return df
 
 
@@ -65,9 +114,17 @@ def _ensure_required_columns(df: pd.DataFrame) -> pd.DataFrame:
         if col not in df.columns:
             df[col] = 0
 
-    # Numeric coercion (non-numeric become NaN -> fill 0)
-    for col in GAME_COLUMNS + ["Column 6", "Total_points"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    # Numeric coercion in one block (non-numeric become NaN -> fill 0)
+    num_cols = GAME_COLUMNS + ["Column 6", "Total_points"]
+    block = df[num_cols].apply(pd.to_numeric, errors="coerce").fillna(0)
+
+    # Downcast to int32 only when lossless; fractional/huge scores stay float
+    vals = block.to_numpy(dtype=np.float64)
+    i32 = np.iinfo(np.int32)
+    fits_int32 = not vals.size or (
+        (vals == np.trunc(vals)).all() and vals.min() >= i32.min and vals.max() <= i32.max
+    )
+    df[num_cols] = block.astype(np.int32 if fits_int32 else np.float64)
 
     # Team names as strings
     df["Team_Name"] = df["Team_Name"].astype(str)
@@ -76,12 +133,19 @@ def _ensure_required_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 def _compute_totals_and_rank(df: pd.DataFrame) -> pd.DataFrame:
     # If Total_points looks empty/zero, compute it.
-    if (df["Total_points"].fillna(0) == 0).all():
-        df["Total_points"] = df[GAME_COLUMNS].sum(axis=1) + df["Column 6"]
-
-    # Rank (dense) by Total_points, descending
-    df["Rank"] = df["Total_points"].rank(method="dense", ascending=False).astype(int)
-    df = df.sort_values(["Total_points", "Team_Name"], ascending=[False, True]).reset_index(drop=True)
+    # Numeric columns are already NaN-free here, so a plain .any() suffices.
+    if not df["Total_points"].to_numpy().any():
+        # Keep the block's dtype (int32, or float64 for fractional scores)
+        dtype = df["Total_points"].dtype
+        df["Total_points"] = df[GAME_COLUMNS].to_numpy().sum(axis=1, dtype=dtype) + df["Column 6"].to_numpy()
+
+    # Sort once (stable), then derive the dense rank from the sorted values:
+    # a new rank starts wherever Total_points differs from the row above.
+    df = df.sort_values(
+        ["Total_points", "Team_Name"], ascending=[False, True], kind="mergesort"
+    ).reset_index(drop=True)
+    tp = df["Total_points"].to_numpy()
+    df["Rank"] = np.r_[True, tp[1:] != tp[:-1]][:tp.size].cumsum().astype(np.int32)
 
     # Reorder
     ordered_cols = ["Rank", "Team_Name", *GAME_COLUMNS, "Column 6", "Total_points"]
@@ -90,149 +154,240 @@ def _compute_totals_and_rank(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # ---------------------- Data loaders ---------------------
-@st.cache_data(show_spinner=False)
 def load_base_data() -> pd.DataFrame:
+    # Only used once per session to seed the fallback data, so not worth caching
     data = {
         'Team_Name': [f'Team_{i}' for i in range(1, 9)],
-        'Game_1': [0]*8,
-        'Game_2': [0]*8,
-        'Game_3': [0]*8,
-        'Game_4': [0]*8,
+        **{c: [0]*8 for c in GAME_COLUMNS},
         'Column 6': [0]*8,
         'Total_points': [0]*8
     }
-    return pd.DataFrame(data)
+    return pd.DataFrame(data).astype({c: "int32" for c in GAME_COLUMNS + ["Column 6", "Total_points"]})
+
+
+def _summarize(df: pd.DataFrame) -> dict:
+    """
+    Precompute the figures the UI needs from an already-ranked frame,
+    so reruns don't have to sort or reduce it again.
+    """
+    # Frame is already sorted by Total_points (desc): leader/top 3 are the head rows
+    tp = df["Total_points"].to_numpy()
+    n = tp.size
+    mx = int(tp.max()) if n else 0
+    top3 = df.head(3)
+    best_idx = top3[GAME_COLUMNS].to_numpy().argmax(axis=1)  # 0..3 per team
+    return {
+        "n": n,
+        "max": mx,
+        "mean": float(tp.mean()) if n else 0.0,
+        "leader": df.iloc[0]["Team_Name"] if n and tp[0] > 0 else "TBD",
+        "top3": top3.to_dict("records"),
+        "top3_best": [GAME_COLUMNS[i].replace("_", " ") for i in best_idx],
+    }
+
+
+@st.cache_resource
+def _http_session() -> requests.Session:
+    return requests.Session()
+
+
+def _time_bucket() -> str:
+    """Revision key that changes once per refresh interval."""
+    return f"t{int(time.time() * 1000 // REFRESH_INTERVAL_MS)}"
+
+
+def _sheet_revision(csv_url: str) -> str:
+    """
+    Cheap HEAD request for the sheet's ETag / Last-Modified.
+    The result is used as part of the cache key, so unchanged data is a cache hit.
+    If the sheet sends neither header, or HEAD fails, fall back to a time bucket
+    (acts like a TTL) so the data still expires.
+    """
+    if _gsheets_configured():
+        # Private sheet: an unauthenticated HEAD on the CSV export can't see it
+        return _time_bucket()
+    if time.time() < st.session_state.get("head_retry_at", 0.0):
+        # Backing off after a failed HEAD; don't block every rerun on it
+        return _time_bucket()
+    try:
+        r = _http_session().head(csv_url, allow_redirects=True, timeout=HEAD_TIMEOUT_S)
+        r.raise_for_status()
+        rev = r.headers.get("ETag") or r.headers.get("Last-Modified")
+    except requests.RequestException:
+        # Back off briefly; expire by time until HEAD works again
+        st.session_state["head_retry_at"] = time.time() + HEAD_BACKOFF_S
+        return _time_bucket()
+    return rev or _time_bucket()
+
+
+def _read_csv(src) -> pd.DataFrame:
+    """
+    Parse with the multithreaded Arrow engine, then cast to the expected schema.
+    If the sheet's cells don't fit it (text or fractional scores), fall back to
+    the default C parser once; _normalize_columns/_ensure_required_columns fix it up.
+    """
+    try:
+        return pd.read_csv(src, engine="pyarrow", dtype_backend="pyarrow", dtype=_READ_DTYPES)
+    except (ValueError, TypeError, KeyError):
+        if hasattr(src, "seek"):
+            src.seek(0)
+        return pd.read_csv(src, engine="c")
+
+
+def _gsheets_configured() -> bool:
+    """True when a [connections.gsheets] secret is set up for the Sheets API."""
+    if GSheetsConnection is None:
+        return False
+    try:
+        return "gsheets" in st.secrets.get("connections", {})
+    except FileNotFoundError:  # no secrets.toml at all
+        return False
 
 
-@st.cache_data(ttl=60*60, show_spinner=True)
 def load_from_gsheet(csv_url: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_url)
+    if _gsheets_configured():
+        # Authenticated Sheets API; further tabs can be read over the same connection.
+        # ttl=0 because invalidation is already handled by our revision-keyed cache.
+        conn = st.connection("gsheets", type=GSheetsConnection)
+        return conn.read(spreadsheet=SHEET_URL, worksheet=0, ttl=0)
+
+    # Unauthenticated fallback: public CSV export
+    r = _http_session().get(csv_url, timeout=10)
+    r.raise_for_status()
+    return _read_csv(io.BytesIO(r.content))
+
+
+# `etag` is only here to key the cache on the sheet revision; a few entries
+# suffice since only the latest revision is ever requested again.
+@st.cache_data(ttl=None, max_entries=3, show_spinner=True)
+def load_and_summarize(csv_url: str, etag: str) -> tuple[pd.DataFrame, dict]:
+    df = load_from_gsheet(csv_url)
     df = _normalize_columns(df)
     df = _ensure_required_columns(df)
     df = _compute_totals_and_rank(df)
-    return df
+    return df, _summarize(df)
 
 
 # ---------------------- UI -------------------------------
-st.title("🏆 Fund Raiser Competition Leaderboard")
-st.markdown("---")
+def _force_refresh() -> None:
+    load_and_summarize.clear()
+    if "last_data" in st.session_state:
+        # Force a reload but keep the data itself as the outage fallback
+        st.session_state["last_data"]["etag"] = None
+    st.session_state["refresh_requested"] = True
 
-# Create main layout: leaderboard (col1) + controls (col2)
-col1, col2 = st.columns([3, 1])
 
-# ------------- Controls (col2) -------------
-with col2:
-    st.subheader("⚙️ Controls")
+def _render_board() -> None:
+    """
+    Leaderboard + statistics. Runs as a fragment, so auto-refresh ticks
+    only re-execute this part of the page.
+    """
+    # Create main layout: leaderboard (col1) + status (col2)
+    col1, col2 = st.columns([3, 1])
+    refreshed = st.session_state.pop("refresh_requested", False)
+
+    # Load data (live from  Sheet). The last good copy is kept per session with
+    # the revision it came from: an unchanged revision skips the cache lookup
+    # (and its unpickling) entirely, and outages keep showing it.
+    if "last_data" not in st.session_state:
+        base = load_base_data()
+        st.session_state["last_data"] = {
+            "etag": None, "df": base, "stats": _summarize(base), "loaded_at": None,
+        }
+    last = st.session_state["last_data"]
+    try:
+        etag = _sheet_revision(CSV_URL)
+        if etag != last["etag"]:
+            df, stats = load_and_summarize(CSV_URL, etag)
+            loaded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            st.session_state["last_data"] = last = {
+                "etag": etag, "df": df, "stats": stats, "loaded_at": loaded_at,
+            }
+        load_ok = True
+    except Exception as e:
+        load_ok = False
+        with col2:
+            if last["loaded_at"] is not None:
+                st.warning(f"Using cached data from {last['loaded_at']}; could not load Sheet: {e}")
+            else:
+                st.error(f"Could not load Sheet: {e}")
+    df, stats = last["df"], last["stats"]
+
+    # Show status & last updated
+    with col2:
+        if load_ok and refreshed:
+            st.success(f"Data refreshed at {last['loaded_at']}")
+        elif load_ok:
+            st.caption(f"Last loaded at: {last['loaded_at']}")
+
+    # ------------- Leaderboard (col1) -------------
+    with col1:
+        st.subheader("📊 Fund Raiser Leaderboard")
+        st.dataframe(
+            df,
+            use_container_width=True,
+            hide_index=True,
+            column_config=_COLUMN_CONFIG
+        )
+
+    # Statistics
+    st.markdown("---")
+    st.subheader("📈 Competition Statistics")
 
-    # Optional auto-refresh (every 2 minutes)
-    auto_refresh = st.toggle("Auto-refresh (every 2 min)", value=True, help="Reloads the app periodically")
-    if auto_refresh:
-        try:
-            from streamlit_autorefresh import st_autorefresh
-            # Every 120000 ms (2 minutes)
-            st_autorefresh(interval=5_000, key="auto_refresh_tick")
-        except Exception:
-            st.info("Install `streamlit-autorefresh` to enable auto-refresh: `pip install streamlit-autorefresh`")
+    c1, c2, c3, c4 = st.columns(4)
 
-    # Manual refresh button
-    do_refresh = st.button("🔄 Refresh now", help="Force re-download of Sheet")
+    with c1:
+        st.metric("Total Teams", stats["n"])
 
-# Load data (live from  Sheet)
-try:
-    if do_refresh:
-        load_from_gsheet.clear()
-    df = load_from_gsheet(CSV_URL)
-    load_ok = True
-except Exception as e:
-    df = load_base_data()
-    load_ok = False
-    with col2:
-        st.error(f"Could not load Sheet: {e}")
-
-# Show status & last updated
-with col2:
-    now_txt = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    if load_ok and do_refresh:
-        st.success(f"Data refreshed at {now_txt}")
-    elif load_ok:
-        st.caption(f"Last loaded at: {now_txt}")
-
-# ------------- Leaderboard (col1) -------------
-with col1:
-    st.subheader("📊 Fund Raiser Leaderboard")
-
-    column_config = {
-        "Team_Name": st.column_config.TextColumn("🏅 Team Name", help="Team participating in the fund raiser"),
-        "Game_1": st.column_config.NumberColumn("🎮 Game 1", help="Points from Game 1", format="%d"),
-        "Game_2": st.column_config.NumberColumn("🎯 Game 2", help="Points from Game 2", format="%d"),
-        "Game_3": st.column_config.NumberColumn("🎲 Game 3", help="Points from Game 3", format="%d"),
-        "Game_4": st.column_config.NumberColumn("🏃 Game 4", help="Points from Game 4", format="%d"),
-        "Column 6": st.column_config.NumberColumn("⭐ Bonus", help="Bonus points", format="%d"),
-        "Total_points": st.column_config.NumberColumn("🏆 Total Points", help="Sum of all points", format="%d"),
-        "Rank": st.column_config.NumberColumn("🥇 Rank", help="Current ranking position", format="%d"),
-    }
+    with c2:
+        st.metric("Highest Score", f"{stats['max']}")
 
-    st.dataframe(
-        df,
-        use_container_width=True,
-        hide_index=True,
-        column_config=column_config
-    )
+    with c3:
+        st.metric("Average Score", f"{stats['mean']:.0f}")
 
-# ---------------- Statistics (below both cols) ----------------
-st.markdown("---")
-st.subheader("📈 Competition Statistics")
+    with c4:
+        st.metric("Leading Team", stats["leader"])
 
-c1, c2, c3, c4 = st.columns(4)
+    # Top 3 cards
+    if stats["n"] and stats["max"] > 0:
+        st.markdown("---")
+        st.subheader("🥇 Top 3 Teams")
+        cols = st.columns(3)
 
-with c1:
-    st.metric("Total Teams", len(df))
+        for i, (team, best_game_label) in enumerate(zip(stats["top3"], stats["top3_best"])):
+            card = cols[i].container(border=True)
+            card.markdown(f"## {_MEDALS[i]}")
+            card.markdown(f"### {team['Team_Name']}")
+            card.metric("Total Points", int(team["Total_points"]))
+            card.caption(f"Best Game: {best_game_label}")
 
-with c2:
-    st.metric("Highest Score", f"{int(df['Total_points'].max()) if len(df) else 0}")
 
-with c3:
-    st.metric("Average Score", f"{df['Total_points'].mean():.0f}" if len(df) else "0")
+st.title("🏆 Fund Raiser Competition Leaderboard")
+st.markdown("---")
 
-with c4:
-    if len(df) and df['Total_points'].max() > 0:
-        leader = df.sort_values('Total_points', ascending=False).iloc[0]['Team_Name']
-    else:
-        leader = "TBD"
-    st.metric("Leading Team", leader)
+# ------------- Controls (sidebar) -------------
+with st.sidebar:
+    st.subheader("⚙️ Controls")
 
-# Top 3 cards
-if len(df) and df["Total_points"].sum() > 0:
-    st.markdown("---")
-    st.subheader("🥇 Top 3 Teams")
-    top_3 = df.sort_values('Total_points', ascending=False).head(3)
-    cols = st.columns(3)
-    medals = ["🥇", "🥈", "🥉"]
-
-    for i, (_, team) in enumerate(top_3.iterrows()):
-        # find best game index
-        game_vals = [team[g] for g in GAME_COLUMNS]
-        best_idx = int(pd.Series(game_vals).idxmax())  # 0..3
-        best_game_label = GAME_COLUMNS[best_idx].replace("_", " ")
-
-        with cols[i]:
-            st.markdown(f"""
-            <div style="text-align: center; padding: 20px; border-radius: 10px; 
-                       background-color: rgba(68, 114, 196, 0.08); border: 2px solid #4472C4;">
-                <h2>{medals[i]}</h2>
-                <h3>{team['Team_Name']}</h3>
-                <p><strong>Total Points:</strong> {int(team['Total_points'])}</p>
-                <p><strong>Best Game:</strong> {best_game_label}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    # Optional auto-refresh (every 2 minutes)
+    auto_refresh = st.toggle("Auto-refresh (every 2 min)", value=True, help="Reloads the leaderboard periodically")
+
+    # Manual refresh button
+    st.button("🔄 Refresh now", help="Force re-download of Sheet", on_click=_force_refresh)
+
+if hasattr(st, "fragment"):
+    # Fragment cadence replaces a full-script autorefresh
+    run_every = timedelta(milliseconds=REFRESH_INTERVAL_MS) if auto_refresh else None
+    st.fragment(_render_board, run_every=run_every)()
+else:
+    if auto_refresh and _HAS_AUTOREFRESH:
+        st_autorefresh(interval=REFRESH_INTERVAL_MS, key="auto_refresh_tick")
+    elif auto_refresh:
+        with st.sidebar:
+            st.info("Install `streamlit-autorefresh` to enable auto-refresh: `pip install streamlit-autorefresh`")
+    _render_board()
 
 # Footer
 st.markdown("---")
-st.markdown(
-    f"""
-    <div style="text-align: center; color: gray; font-size: 12px;">
-        🏆 Fund Raiser Competition Dashboard | Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+# Static: the load time is shown next to the leaderboard and refreshes with it
+st.caption("🏆 Fund Raiser Competition Dashboard")